@@ -0,0 +1,50 @@
+import numpy as np
+
+# numba is optional, it is only used to speed up histograms of large arrays
+try:
+    from numba import njit, prange, get_num_threads
+except ImportError:
+    HAS_NUMBA = False
+else:
+    HAS_NUMBA = True
+
+
+if HAS_NUMBA:
+    # compiled once per input dtype, the compiled function is cached on disk and re-used between sessions
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _uniform_hist(data: np.ndarray, bin_edges: np.ndarray, n_blocks: int) -> np.ndarray:
+        n = data.shape[0]
+        block_size = (n + n_blocks - 1) // n_blocks
+
+        nbins = bin_edges.shape[0] - 1
+        lo, hi = bin_edges[0], bin_edges[nbins]
+        local_hists = np.zeros((n_blocks, nbins), dtype=np.int64)
+
+        for block in prange(n_blocks):
+            start = block * block_size
+            stop = min(start + block_size, n)
+
+            for i in range(start, stop):
+                x = data[i]
+                ix = int((x - lo) / (hi - lo) * nbins)
+                # the last bin is closed on the right
+                if ix > nbins - 1:
+                    ix = nbins - 1
+                elif ix < 0:
+                    ix = 0
+
+                # rounding in the scaling can put a sample in a neighbouring bin, fix it against the edges
+                if x < bin_edges[ix]:
+                    ix -= 1
+                elif ix != nbins - 1 and x >= bin_edges[ix + 1]:
+                    ix += 1
+
+                local_hists[block, ix] += 1
+
+        return local_hists.sum(axis=0)
+
+    def uniform_hist(data: np.ndarray, bin_edges: np.ndarray) -> np.ndarray:
+        # Counts of a 1D array in the uniform bins given by `bin_edges`, where the first and
+        # last edges are the min and max of `data`, same counts as np.histogram. Each thread
+        # bins one contiguous block of `data` into its own histogram, these are summed at the end.
+        return _uniform_hist(data, bin_edges, get_num_threads())
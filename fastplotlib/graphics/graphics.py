@@ -1,10 +1,13 @@
 import numpy as np
 import pygfx
 from typing import *
-from ..utils import get_cmap_texture, get_colors, map_labels_to_colors, quick_min_max
+from ..utils import get_cmap_texture, get_colors, map_labels_to_colors, quick_min_max, compute_histogram, \
+    upload_ranges
 
 
 class _Graphic:
+    __slots__ = ('data', 'x', 'y', 'colors', 'world_object', '_subplot', '_pending_uploads')
+
     def __init__(
             self,
             data,
@@ -13,18 +16,31 @@ class _Graphic:
             cmap: str = None,
             alpha: float = 1.0
     ):
-        self.data = data.astype(np.float32)
+        # the graphic owns a copy of the data, update_data() writes into it in place
+        if isinstance(data, tuple):
+            # separate 1D arrays for x and y
+            self.x, self.y = [np.array(d, dtype=np.float32) for d in data]
+            self.data = None
+        else:
+            self.data = np.array(data, dtype=np.float32)
+
         self.colors = None
+        # Subplot that the graphic has been added to
+        self._subplot = None
+        # (buffer or texture, range) that have changed since the last upload to the GPU, the Subplot
+        # merges these and uploads them before rendering. Ranges are (offset, size) for buffers
+        # and (x, y, w, h) for textures.
+        self._pending_uploads: List[Tuple[Union[pygfx.Buffer, pygfx.Texture], Tuple[int, ...]]] = list()
 
         if colors_length is None:
-            colors_length = self.data.shape[0]
+            colors_length = self.x.shape[0] if self.data is None else self.data.shape[0]
 
         if colors is not False:
             self._set_colors(colors, colors_length, cmap, alpha, )
 
     def _set_colors(self, colors, colors_length, cmap, alpha):
         if colors is None and cmap is None:  # just white
-            self.colors = np.vstack([[1., 1., 1., 1.]] * colors_length).astype(np.float32)
+            self.colors = np.ones((colors_length, 4), dtype=np.float32)
 
         elif (colors is None) and (cmap is not None):
             self.colors = get_colors(n_colors=colors_length, cmap=cmap, alpha=alpha)
@@ -32,7 +48,7 @@ class _Graphic:
         elif (colors is not None) and (cmap is None):
             # assume it's already an RGBA array
             if colors.ndim == 2 and colors.shape[1] == 4 and colors.shape[0] == colors_length:
-                self.colors = colors.astype(np.float32)
+                self.colors = np.asarray(colors, dtype=np.float32)
 
             else:
                 raise ValueError(f"Colors array must have ndim == 2 and shape of [<n_datapoints>, 4]")
@@ -40,7 +56,7 @@ class _Graphic:
         elif (colors is not None) and (cmap is not None):
             if colors.ndim == 1 and np.issubdtype(colors.dtype, np.integer):
                 # assume it's a mapping of colors
-                self.colors = np.array(map_labels_to_colors(colors, cmap, alpha=alpha)).astype(np.float32)
+                self.colors = np.asarray(map_labels_to_colors(colors, cmap, alpha=alpha), dtype=np.float32)
 
         else:
             raise ValueError("Unknown color format")
@@ -52,8 +68,20 @@ class _Graphic:
     def update_data(self, data: Any):
         pass
 
+    def _queue_upload(self, resource: Union[pygfx.Buffer, pygfx.Texture], _range: Tuple[int, ...]):
+        if self._subplot is None:
+            # no Subplot to flush the pending uploads, upload right away
+            upload_ranges(resource, [_range])
+        else:
+            self._pending_uploads.append((resource, _range))
+
 
 class Image(_Graphic):
+    __slots__ = ('_texture',)
+
+    # max number of pixels for which update_data() diffs against the current data to find the changed region
+    _diff_max_size: int = 128 * 128
+
     def __init__(
             self,
             data: np.ndarray,
@@ -69,13 +97,16 @@ class Image(_Graphic):
         super().__init__(data, cmap=cmap, *args, **kwargs)
 
         if (vmin is None) or (vmax is None):
-            vmin, vmax = quick_min_max(data)
+            # estimate from a strided subsample, this is close enough for the contrast limits
+            vmin, vmax = quick_min_max(data, max_size=100_000)
 
         self.world_object: pygfx.Image = pygfx.Image(
             pygfx.Geometry(grid=pygfx.Texture(self.data, dim=2)),
             pygfx.ImageBasicMaterial(clim=(vmin, vmax), map=get_cmap_texture(cmap))
         )
 
+        self._texture: pygfx.Texture = self.world_object.geometry.grid
+
     @property
     def clim(self) -> Tuple[float, float]:
         return self.world_object.material.clim
@@ -84,33 +115,80 @@ class Image(_Graphic):
     def clim(self, levels: Tuple[float, float]):
         self.world_object.material.clim = levels
 
-    def update_data(self, data: np.ndarray):
-        self.world_object.geometry.grid.data[:] = data
-        self.world_object.geometry.grid.update_range((0, 0, 0), self.world_object.geometry.grid.size)
+    def update_data(self, data: np.ndarray, region: Tuple[int, int, int, int] = None):
+        """
+        Update the image data, only the parts of the texture that change are uploaded to the GPU
+
+        Parameters
+        ----------
+        data: np.ndarray
+            new image data, the same shape as the full image if ``region`` is ``None``,
+            otherwise of shape ``[h, w]``
+
+        region: Tuple[int, int, int, int], optional
+            ``(x, y, w, h)`` region of the image that ``data`` replaces
+        """
+        if region is None:
+            region = self._get_changed_region(data)
+            if region is None:
+                # nothing changed
+                return
+
+            x0, y0, w, h = region
+            data = data[y0:y0 + h, x0:x0 + w]
+        else:
+            x0, y0, w, h = [int(v) for v in region]
+            height, width = self._texture.data.shape[:2]
+
+            if not (0 <= x0 and 0 <= y0 and 0 <= w and 0 <= h and x0 + w <= width and y0 + h <= height):
+                raise ValueError(f"`region` {region} is outside of the image of shape [{height}, {width}]")
+            if data.shape[:2] != (h, w):
+                raise ValueError(f"`data` must be of shape [h, w] = [{h}, {w}] for the given `region`, "
+                                 f"got {data.shape}")
+
+        self._texture.data[y0:y0 + h, x0:x0 + w] = data
+        self._queue_upload(self._texture, (x0, y0, w, h))
+
+    def _get_changed_region(self, data: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        # bounding (x, y, w, h) region of the pixels that differ from the current texture data
+        h, w = self._texture.data.shape[:2]
+
+        # only worth diffing for smaller images, assume large images have changed entirely.
+        # data that shares memory with the texture, such as Image.data edited in place,
+        # cannot be diffed against it
+        if self._texture.data.size > self._diff_max_size or np.shares_memory(data, self._texture.data):
+            return 0, 0, w, h
+
+        changed = np.not_equal(self._texture.data, data)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return None
+
+        cols = np.flatnonzero(changed.any(axis=0))
+
+        return int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
 
     def update_cmap(self, cmap: str, alpha: float = 1.0):
-        self.world_object.material.map = get_cmap_texture(name=cmap)
+        cmap_texture = get_cmap_texture(name=cmap)
 
+        if self.world_object.material.map is not cmap_texture:
+            self.world_object.material.map = cmap_texture
 
-class Scatter(_Graphic):
-    def __init__(self, data: np.ndarray, size: int = 1, colors: np.ndarray = None, cmap: str = None, *args, **kwargs):
-        super(Scatter, self).__init__(data, colors=colors, cmap=cmap, *args, **kwargs)
 
-        self.world_object: pygfx.Group = pygfx.Group()
-        self.points_objects: List[pygfx.Points] = list()
+class Scatter(_Graphic):
+    __slots__ = ()
 
-        for color in np.unique(self.colors, axis=0):
-            positions = self._process_positions(
-                self.data[np.all(self.colors == color, axis=1)]
-            )
+    def __init__(self, data: np.ndarray, size: int = 1, colors: np.ndarray = None, cmap: str = None, *args, **kwargs):
+        super(Scatter, self).__init__(self._process_positions(data), colors=colors, cmap=cmap, *args, **kwargs)
 
-            points = pygfx.Points(
-                pygfx.Geometry(positions=positions),
-                pygfx.PointsMaterial(size=size, color=color)
-            )
+        # a single points object with per-vertex colors, drawn in one draw call
+        self.world_object: pygfx.Points = pygfx.Points(
+            pygfx.Geometry(positions=self.data, colors=self.colors),
+            pygfx.PointsMaterial(size=size, vertex_colors=True)
+        )
 
-            self.world_object.add(points)
-            self.points_objects.append(points)
+        # share memory with the positions buffer so updates are written in place
+        self.data = self.world_object.geometry.positions.data
 
     def _process_positions(self, positions: np.ndarray):
         if positions.ndim == 1:
@@ -118,14 +196,32 @@ class Scatter(_Graphic):
 
         return positions
 
-    def update_data(self, data: np.ndarray):
-        positions = self._process_positions(data).astype(np.float32)
+    def update_data(self, data: np.ndarray, start: int = 0):
+        """
+        Update the positions of the points, only the changed points are uploaded to the GPU
+
+        Parameters
+        ----------
+        data: np.ndarray
+            new positions of the points
+
+        start: int, default 0
+            index of the first point that ``data`` replaces
+        """
+        positions = np.asarray(self._process_positions(data), dtype=np.float32)
 
-        self.points_objects[0].geometry.positions.data[:] = positions
-        self.points_objects[0].geometry.positions.update_range(positions.shape[0])
+        # pygfx requires python ints for the update range
+        start = int(start)
+        n_points = positions.shape[0]
+        buffer = self.world_object.geometry.positions
+
+        np.copyto(buffer.data[start:start + n_points], positions)
+        self._queue_upload(buffer, (start, n_points))
 
 
 class Line(_Graphic):
+    __slots__ = ()
+
     def __init__(self, data: np.ndarray, size: float = 2.0, colors: np.ndarray = None, cmap: str = None, *args, **kwargs):
         super(Line, self).__init__(data, colors=colors, cmap=cmap, *args, **kwargs)
 
@@ -141,20 +237,17 @@ class Line(_Graphic):
             material=material(thickness=size, vertex_colors=True)
         )
 
-    def update_data(self, data: Any):
-        self.data = data.astype(np.float32)
-        self.world_object.geometry.positions.data[:] = self.data
-        self.world_object.geometry.positions.update_range()
-
+        # share memory with the positions buffer so updates are written in place
+        self.data = self.world_object.geometry.positions.data
 
-class _HistogramBin(pygfx.Mesh):
-    def __int__(self, *args, **kwargs):
-        super(_HistogramBin, self).__init__(*args, **kwargs)
-        self.bin_center: float = None
-        self.frequency: Union[int, float] = None
+    def update_data(self, data: Any):
+        np.copyto(self.data, np.asarray(data, dtype=np.float32))
+        self._queue_upload(self.world_object.geometry.positions, (0, self.data.shape[0]))
 
 
 class Histogram(_Graphic):
+    __slots__ = ('hist', 'bin_edges', 'bin_interval', 'bin_centers')
+
     def __init__(
             self,
             data: np.ndarray = None,
@@ -166,7 +259,7 @@ class Histogram(_Graphic):
     ):
 
         if pre_computed is None:
-            self.hist, self.bin_edges = np.histogram(data, bins)
+            self.hist, self.bin_edges = compute_histogram(data, bins)
         else:
             if not set(pre_computed.keys()) == {'hist', 'bin_edges'}:
                 raise ValueError("argument to `pre_computed` must be a `dict` with keys 'hist' and 'bin_edges'")
@@ -174,36 +267,39 @@ class Histogram(_Graphic):
                 raise ValueError("argument to `pre_computed` must be a `dict` where the values are numpy.ndarray")
             self.hist, self.bin_edges = pre_computed["hist"], pre_computed["bin_edges"]
 
-        self.bin_interval = (self.bin_edges[1] - self.bin_edges[0]) / 2
-        self.bin_centers = (self.bin_edges + self.bin_interval)[:-1]
-
-        # scale between 0 - draw_scale_factor
-        scaled_bin_edges = ((self.bin_edges - self.bin_edges.min()) / (np.ptp(self.bin_edges))) * draw_scale_factor
+        n_bins = self.hist.shape[0]
+        bin_widths = np.diff(self.bin_edges)
 
-        bin_interval_scaled = scaled_bin_edges[1] / 2
-        # get the centers of the bins from the edges
-        x_positions_bins = (scaled_bin_edges + bin_interval_scaled)[:-1].astype(np.float32)
-
-        n_bins = x_positions_bins.shape[0]
-        bin_width = (draw_scale_factor / n_bins) * draw_bin_width_scale
+        self.bin_interval = (self.bin_edges[1] - self.bin_edges[0]) / 2
+        self.bin_centers = self.bin_edges[:-1] + bin_widths / 2
 
-        self.hist = self.hist.astype(np.float32)
-        data = np.vstack([x_positions_bins, self.hist])
+        # centers and widths of the bins scaled between 0 - draw_scale_factor
+        if np.allclose(bin_widths, bin_widths[0], rtol=1e-5, atol=0):
+            # uniform bins, the centers can be computed directly
+            x_positions_bins = (np.arange(n_bins, dtype=np.float32) + 0.5) * np.float32(draw_scale_factor / n_bins)
+            bin_width = (draw_scale_factor / n_bins) * draw_bin_width_scale
+        else:
+            scale = draw_scale_factor / (self.bin_edges[-1] - self.bin_edges[0])
+            x_positions_bins = ((self.bin_edges[:-1] + bin_widths / 2 - self.bin_edges[0]) * scale).astype(np.float32)
+            bin_width = (bin_widths * (scale * draw_bin_width_scale)).astype(np.float32)
 
-        super(Histogram, self).__init__(data=data, colors=colors, colors_length=n_bins)
+        self.hist = np.asarray(self.hist, dtype=np.float32)
 
-        self.world_object: pygfx.Group = pygfx.Group()
+        super(Histogram, self).__init__(data=(x_positions_bins, self.hist), colors=colors, colors_length=n_bins)
 
-        for x_val, y_val, bin_center in zip(x_positions_bins, self.hist, self.bin_centers):
-            geometry = pygfx.plane_geometry(
-                width=bin_width,
-                height=y_val,
-            )
+        # one instanced unit plane for all bins, each instance is translated and scaled to its bin
+        self.world_object: pygfx.InstancedMesh = pygfx.InstancedMesh(
+            pygfx.plane_geometry(width=1, height=1),
+            pygfx.MeshBasicMaterial(),
+            n_bins
+        )
 
-            material = pygfx.MeshBasicMaterial()
-            hist_bin_graphic = _HistogramBin(geometry, material)
-            hist_bin_graphic.position.set(x_val, (y_val) / 2, 0)
-            hist_bin_graphic.bin_center = bin_center
-            hist_bin_graphic.frequency = y_val
+        # set all the instance matrices at once, they are stored like pygfx.linalg.Matrix4.elements
+        # (column-major), with the scale on the diagonal and the translation in the last row
+        matrices = self.world_object.instance_infos.data["matrix"]
+        matrices[:, 0, 0] = bin_width
+        matrices[:, 1, 1] = self.y
+        matrices[:, 3, 0] = self.x
+        matrices[:, 3, 1] = self.y / 2
 
-            self.world_object.add(hist_bin_graphic)
+        self.world_object.instance_infos.update_range()
@@ -4,10 +4,18 @@ from wgpu.gui.auto import WgpuCanvas
 from .subplot import Subplot
 from . import graphics
 from functools import partial
-from inspect import signature
+from inspect import signature, Signature
 from typing import *
 
 
+# graphic class, signature and docstring for each graphic, computed once at import instead of for every Plot
+_GRAPHIC_FACTORIES: Dict[str, Tuple[type, Signature, str]] = {
+    graphic_cls_name.lower(): (cls, signature(cls), cls.__doc__)
+    for graphic_cls_name in graphics.__all__
+    for cls in [getattr(graphics, graphic_cls_name)]
+}
+
+
 class Plot(Subplot):
     def __init__(
             self,
@@ -25,12 +33,16 @@ class Plot(Subplot):
             controller=controller
         )
 
-        for graphic_cls_name in graphics.__all__:
-            cls = getattr(graphics, graphic_cls_name)
+        for name, (cls, sig, doc) in _GRAPHIC_FACTORIES.items():
             pfunc = partial(self._create_graphic, cls)
-            pfunc.__signature__ = signature(cls)
-            pfunc.__doc__ = cls.__doc__
-            setattr(self, graphic_cls_name.lower(), pfunc)
+            pfunc.__signature__ = sig
+            pfunc.__doc__ = doc
+            setattr(self, name, pfunc)
+
+        # bound once here since animate() is called on every frame
+        self._animate_parent = super(Plot, self).animate
+        self._flush = self.renderer.flush
+        self._request_draw = self.canvas.request_draw
 
     def _create_graphic(self, graphic_class, *args, **kwargs):
         graphic = graphic_class(*args, **kwargs)
@@ -39,10 +51,10 @@ class Plot(Subplot):
         return graphic
 
     def animate(self):
-        super(Plot, self).animate(canvas_dims=None)
+        self._animate_parent(canvas_dims=None)
 
-        self.renderer.flush()
-        self.canvas.request_draw()
+        self._flush()
+        self._request_draw()
 
     def show(self):
         self.canvas.request_draw(self.animate)
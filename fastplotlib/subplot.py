@@ -4,6 +4,7 @@ from pygfx import Scene, OrthographicCamera, PerspectiveCamera, PanZoomControlle
 from pygfx.linalg import Vector3
 from .graphics import *
 from .defaults import camera_types, controller_types
+from .utils import upload_ranges
 from typing import *
 from wgpu.gui.auto import WgpuCanvas
 
@@ -62,6 +63,7 @@ class Subplot:
         self._grid: GridHelper = GridHelper(size=100, thickness=1)
 
         self._animate_funcs = list()
+        self._graphics = list()
 
         self.renderer.add_event_handler(self._produce_rect, "resize")
 
@@ -81,6 +83,9 @@ class Subplot:
 
     def animate(self, canvas_dims: Tuple[int, int] = None):
         self.controller.update_camera(self.camera)
+
+        self._flush_pending_uploads()
+
         self.viewport.render(self.scene, self.camera)
 
         for f in self._animate_funcs:
@@ -89,8 +94,27 @@ class Subplot:
     def add_animations(self, funcs: List[callable]):
         self._animate_funcs += funcs
 
+    def _flush_pending_uploads(self, graphics: List = None):
+        # gather the changes that the graphics have made to their buffers and textures since the last
+        # frame, grouped per buffer or texture so that each is uploaded with as few update_range calls
+        # as possible
+        if graphics is None:
+            graphics = self._graphics
+
+        pending = dict()
+        for graphic in graphics:
+            for resource, _range in graphic._pending_uploads:
+                pending.setdefault(id(resource), (resource, list()))[1].append(_range)
+
+            graphic._pending_uploads.clear()
+
+        for resource, ranges in pending.values():
+            upload_ranges(resource, ranges)
+
     def add_graphic(self, graphic):
         self.scene.add(graphic.world_object)
+        self._graphics.append(graphic)
+        graphic._subplot = self
 
         if isinstance(graphic, Image):
             dims = graphic.data.shape
@@ -140,4 +164,9 @@ class Subplot:
             self.scene.remove(self._grid)
 
     def remove_graphic(self, graphic):
-        self.scene.remove(graphic.world_object)
\ No newline at end of file
+        self.scene.remove(graphic.world_object)
+        self._graphics.remove(graphic)
+
+        # upload what is still pending, the graphic uploads its own changes from now on
+        self._flush_pending_uploads([graphic])
+        graphic._subplot = None
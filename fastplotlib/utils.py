@@ -1,6 +1,7 @@
 import numpy as np
-from pygfx import Texture
+from pygfx import Buffer, Texture
 from collections import OrderedDict
+from functools import lru_cache
 from typing import *
 from pathlib import Path
 # some funcs adapted from mesmerize
@@ -26,10 +27,17 @@ def get_colors(
         -> List[Union[np.ndarray, str]]:
     cmap = _get_cmap(cmap, alpha)
     cm_ixs = np.linspace(0, 255, n_colors, dtype=int)
-    return np.take(cmap, cm_ixs, axis=0).astype(np.float32)
+    return np.asarray(np.take(cmap, cm_ixs, axis=0), dtype=np.float32)
 
 
 def get_cmap_texture(name: str, alpha: float = 1.0) -> Texture:
+    # arguments are passed on positionally so that every call style shares the same cache entry
+    return _get_cmap_texture(name, alpha)
+
+
+# cached so that the same cmap texture is not re-created and re-uploaded to the GPU
+@lru_cache(maxsize=64)
+def _get_cmap_texture(name: str, alpha: float) -> Texture:
     cmap = _get_cmap(name)
     return Texture(cmap, dim=1).get_view()
 
@@ -64,14 +72,136 @@ def map_labels_to_colors(labels: iter, cmap: str, **kwargs) -> list:
     return list(map(mapper.get, labels))
 
 
-def quick_min_max(data: np.ndarray) -> Tuple[float, float]:
+def quick_min_max(data: np.ndarray, max_size: int = 1e6) -> Tuple[float, float]:
     # from pyqtgraph.ImageView
     # Estimate the min/max values of *data* by subsampling.
+    # *data* is strided along its largest axis until it has at most *max_size* elements
     # Returns [(min, max), ...] with one item per channel
-    while data.size > 1e6:
+    while data.size > max_size:
         ax = np.argmax(data.shape)
         sl = [slice(None)] * data.ndim
         sl[ax] = slice(None, None, 2)
         data = data[tuple(sl)]
 
     return float(np.nanmin(data)), float(np.nanmax(data))
+
+
+# min number of samples for which the numba histogram kernel is used
+_NUMBA_HIST_MIN_SIZE = 1_000_000
+# range of the number of bins estimated for bins='auto'
+_AUTO_BINS_MIN, _AUTO_BINS_MAX = 16, 1024
+
+
+def _histogram_range(data: np.ndarray) -> Optional[Tuple[Any, Any]]:
+    # min and max of the data, None if np.histogram must handle the range itself,
+    # it pads the range for constant data and raises for nan/inf
+    lo, hi = data.min(), data.max()
+    if not (np.isfinite(lo) and np.isfinite(hi)) or hi <= lo:
+        return None
+
+    return lo, hi
+
+
+def compute_histogram(data: np.ndarray, bins: Union[int, str] = 'auto') -> Tuple[np.ndarray, np.ndarray]:
+    # Same output as np.histogram(data, bins). For an integer number of bins and
+    # large arrays the counts are computed with a multi-threaded numba kernel if
+    # numba is installed, otherwise np.histogram's own uniform bins path is used.
+    # For bins='auto' with float data the number of bins is estimated with Scott's
+    # rule, which is O(n), instead of numpy's estimators which sort the data.
+    data = np.asarray(data).ravel()
+
+    auto_bins = isinstance(bins, str) and bins == 'auto' and np.issubdtype(data.dtype, np.floating)
+
+    if not (auto_bins or isinstance(bins, (int, np.integer))) or isinstance(bins, bool) \
+            or not (np.issubdtype(data.dtype, np.integer) or np.issubdtype(data.dtype, np.floating)) \
+            or data.size == 0:
+        return np.histogram(data, bins)
+
+    data_range = None
+
+    if auto_bins:
+        data_range = _histogram_range(data)
+        if data_range is None:
+            return np.histogram(data, bins)
+
+        lo, hi = data_range
+        bin_width = 3.5 * float(data.std()) / data.size ** (1 / 3)
+        n_bins = int(np.clip(np.ceil((float(hi) - float(lo)) / bin_width), _AUTO_BINS_MIN, _AUTO_BINS_MAX))
+    else:
+        n_bins = int(bins)
+
+    # np.histogram already bins uniform bins by scaling and np.bincount, with a fix-up against the edges
+    if data.size < _NUMBA_HIST_MIN_SIZE:
+        return np.histogram(data, n_bins)
+
+    # multi-threaded single pass for large arrays
+    # imported only when needed since importing numba is slow
+    from . import _hist_kernel
+    if not _hist_kernel.HAS_NUMBA:
+        return np.histogram(data, n_bins)
+
+    if data_range is None:
+        data_range = _histogram_range(data)
+        if data_range is None:
+            return np.histogram(data, n_bins)
+
+    lo, hi = data_range
+
+    # same edges as np.histogram, of the data's float type or float64 for integer data
+    bin_type = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float64
+
+    bin_edges = np.linspace(lo, hi, n_bins + 1, endpoint=True, dtype=bin_type)
+    hist = _hist_kernel.uniform_hist(data, bin_edges)
+
+    return hist, bin_edges
+
+
+def merge_regions(regions: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    # Coalesce (x, y, w, h) regions of a 2D texture so that fewer, larger uploads are made.
+    # Two regions are merged when they span the same columns and overlap or touch vertically,
+    # or span the same rows and overlap or touch horizontally, the merged region is then
+    # exactly their union so no data outside of the given regions is uploaded.
+    regions = list(set(regions))
+    if len(regions) < 2:
+        return regions
+
+    n_regions = None
+    while n_regions != len(regions):
+        n_regions = len(regions)
+
+        # axis 0: merge along x for regions with the same rows, axis 1: merge along y for the same columns
+        for axis in (0, 1):
+            other = 1 - axis
+            regions.sort(key=lambda r: (r[other], r[other + 2], r[axis]))
+
+            merged = [regions[0]]
+            for region in regions[1:]:
+                last = merged[-1]
+                if (region[other], region[other + 2]) == (last[other], last[other + 2]) \
+                        and region[axis] <= last[axis] + last[axis + 2]:
+                    end = max(last[axis] + last[axis + 2], region[axis] + region[axis + 2])
+                    last = list(last)
+                    last[axis + 2] = end - last[axis]
+                    merged[-1] = tuple(last)
+                else:
+                    merged.append(region)
+
+            regions = merged
+
+    return regions
+
+
+def upload_ranges(resource: Union[Buffer, Texture], ranges: List[Tuple[int, ...]]):
+    # Mark the changed ranges of a buffer, as (offset, size), or of a texture, as (x, y, w, h),
+    # for upload to the GPU with as few update_range calls as possible.
+    # Textures keep every pending range, so adjacent and overlapping regions are merged and each
+    # is uploaded. Buffers keep only one pending range, pygfx merges every range into one
+    # bounding span (by just keeping the first range in older versions), so a single span
+    # covering all the changed ranges is issued per buffer.
+    if isinstance(resource, Texture):
+        for x0, y0, w, h in merge_regions(ranges):
+            resource.update_range((x0, y0, 0), (w, h, 1))
+    else:
+        start = min(offset for offset, size in ranges)
+        stop = max(offset + size for offset, size in ranges)
+        resource.update_range(start, stop - start)